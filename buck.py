@@ -1,14 +1,31 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from selectolax.lexbor import LexborHTMLParser
+from lxml import etree, html as lxml_html
 import re
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 import os
-import time
+import asyncio
+import codecs
+from collections import deque
+from contextlib import nullcontext
 import logging
 from urllib.parse import urljoin, urlparse, parse_qs
-import re
-import requests
-import json
+import aiohttp
+from aiolimiter import AsyncLimiter
+import orjson
+
+try:
+    import brotli  # noqa: F401 - lets aiohttp decode br-encoded responses
+    ACCEPT_ENCODING = 'gzip, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip'
+
+try:
+    import uvloop  # libuv-backed event loop, much faster for the crawler's socket I/O
+except ImportError:
+    uvloop = None
 
 
 # Set up logging
@@ -25,9 +42,13 @@ for env_file in env_files:
 else:
     logger.warning("No .env file found, using system environment variables")
 
-def setup_database():
-    """Setup database connection with proper error handling"""
+def setup_database(bulk_backfill=False):
+    """Setup database connection with proper error handling
+
+    With bulk_backfill, writes are unacknowledged (w=0) for maximum insert throughput.
+    """
     uri = os.getenv("MONGODB_URI")
+    write_options = {"w": 0} if bulk_backfill else {}
     
     # If no URI is provided, try common local connections
     if not uri:
@@ -38,15 +59,19 @@ def setup_database():
         ]
         
         for test_uri in possible_uris:
+            client = None
             try:
                 logger.info(f"Trying to connect to: {test_uri}")
-                client = MongoClient(test_uri, serverSelectionTimeoutMS=5000)
+                client = MongoClient(test_uri, serverSelectionTimeoutMS=5000, **write_options)
                 # Test the connection
                 client.admin.command('ping')
                 logger.info(f"Successfully connected to: {test_uri}")
                 return client, client["osu_faculty"], client["osu_faculty"]["profiles"]
             except Exception as e:
                 logger.warning(f"Failed to connect to {test_uri}: {e}")
+                # Don't leave a client and its monitor threads behind for every failed probe
+                if client is not None:
+                    client.close()
                 continue
         
         # If all local connections fail, suggest alternatives
@@ -58,6 +83,7 @@ def setup_database():
         # Offer fallback to JSON file storage
         return None, None, None
     else:
+        client = None
         try:
             # Atlas-optimized connection settings
             client = MongoClient(
@@ -66,7 +92,7 @@ def setup_database():
                 connectTimeoutMS=30000,
                 socketTimeoutMS=30000,
                 retryWrites=True,
-                w='majority'
+                w=write_options.get("w", 'majority')
             )
             # Test the connection
             client.admin.command('ping')
@@ -74,6 +100,8 @@ def setup_database():
             return client, client["osu_faculty"], client["osu_faculty"]["profiles"]
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB Atlas: {e}")
+            if client is not None:
+                client.close()
             logger.error("Common Atlas issues:")
             logger.error("1. Check if your IP address is whitelisted in Atlas Network Access")
             logger.error("2. Verify username/password in connection string")
@@ -81,53 +109,148 @@ def setup_database():
             return None, None, None
 
 # Try to setup database connection
-client, db, collection = setup_database()
+client, db, collection = setup_database(bulk_backfill=os.getenv("MONGODB_BULK_BACKFILL") == "1")
+
+# Common pagination patterns - adjust these selectors based on the target website
+PAGINATION_SELECTORS = (
+    'a[rel="next"]',  # Next link with rel attribute
+    '.pagination a',  # Links in pagination class
+    '.pager a',       # Links in pager class
+    'a:lexbor-contains("Next")',  # Links containing "Next" text
+    'a:lexbor-contains(">")',     # Links containing ">" symbol
+    '.page-numbers a',     # WordPress style pagination
+    '.pagination-next a',  # Another common pattern
+)
+
+# Numbered pagination in hrefs
+PAGE_PATTERN = re.compile(r'page=\d+|p=\d+|/page/\d+')
+
+# Profile page fields, compiled once for the fixed-schema OSU bio pages
+PROFILE_NAME_XPATH = etree.XPath('string(//div[contains(@class, "bio-top-left")]//h1)')
+PROFILE_EXPERTISE_XPATH = etree.XPath('//div[contains(@class, "bio-exp")]//ul')
+PROFILE_ABOUT_XPATH = etree.XPath('//div[contains(@class, "bio-btm-left")]//p')
+
+# Only build the bio/about blocks the fallback profile selectors look inside
+PROFILE_FALLBACK_STRAINER = SoupStrainer(class_=re.compile(r'bio|about|profile-description'))
+
+# Scraped fields that a fresh, non-empty value may overwrite in MongoDB
+PROFILE_CONTENT_FIELDS = ("full_name", "about_me")
+
+def profile_upsert(doc):
+    """Build the upsert for a scraped profile, keyed on its profile_path"""
+    # Key fields are only written on insert; scraped content replaces stored content
+    # when non-empty, so empty placeholder rows can be filled in by a later run
+    content = {field: doc[field] for field in PROFILE_CONTENT_FIELDS if doc.get(field)}
+    update = {"$setOnInsert": {field: value for field, value in doc.items() if field not in content}}
+    if content:
+        update["$set"] = content
+    return UpdateOne({"profile_path": doc["profile_path"]}, update, upsert=True)
+
+def make_soup(html, parse_only=None, from_encoding=None):
+    """Parse HTML with the C-backed lxml parser, falling back to html.parser"""
+    try:
+        return BeautifulSoup(html, "lxml", parse_only=parse_only, from_encoding=from_encoding)
+    except Exception as e:
+        logger.debug(f"lxml could not parse page, falling back to html.parser: {e}")
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only, from_encoding=from_encoding)
 
 class PaginatedScraper:
-    def __init__(self, base_url, delay=1, use_file_storage=False):
+    def __init__(self, base_url, delay=1, concurrency=8, max_retries=3, backoff_factor=0.5, use_file_storage=False, batch_size=500, max_content_length=5 * 1024 * 1024):
         self.base_url = base_url
         self.delay = delay
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_content_length = max_content_length
         self.use_file_storage = use_file_storage
-        self.file_storage_path = "faculty_profiles.json"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.file_storage_path = "faculty_profiles.ndjson"
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Connection': 'keep-alive',
+            'Accept-Encoding': ACCEPT_ENCODING
+        }
+        self.session = None
+        # Be respectful to the server: at most `concurrency` requests in flight
+        # per host, and no more than `concurrency` requests every `delay` seconds
+        self.host_semaphores = {}
+        # delay=0 means no throttling (AsyncLimiter would divide by zero)
+        self.rate_limiter = AsyncLimiter(concurrency, delay) if delay > 0 else nullcontext()
+        
+        # Profiles waiting to be written to MongoDB in one batch
+        self.pending_profiles = []
+        self.batch_size = batch_size
         
-        # Load existing data if using file storage
+        # Load stored profile paths once so existence checks are set lookups
+        self.seen_paths = set()
         if self.use_file_storage:
-            self.existing_profiles = self.load_from_file()
-        else:
-            self.existing_profiles = []
+            self.seen_paths = self.load_paths_from_file()
+        elif collection is not None:
+            try:
+                collection.create_index([("profile_path", ASCENDING)], unique=True)
+            except Exception as e:
+                logger.warning(f"Could not create unique index on profile_path: {e}")
+            try:
+                # Rows left empty by failed fetches aren't counted, so they get scraped again
+                self.seen_paths = set(collection.distinct("profile_path", {"about_me": {"$nin": ["", None]}}))
+            except Exception as e:
+                logger.error(f"Error loading existing profile paths: {e}")
+    
+    async def __aenter__(self):
+        # Pool and reuse connections so sequential fetches skip the TCP+TLS handshake
+        connector = aiohttp.TCPConnector(
+            limit=64,
+            limit_per_host=32,
+            keepalive_timeout=30
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.flush()
+        await self.session.close()
+        self.session = None
     
-    def load_from_file(self):
-        """Load existing profiles from JSON file"""
+    def load_paths_from_file(self):
+        """Load the profile paths already saved in the NDJSON file"""
+        paths = set()
         try:
-            if os.path.exists(self.file_storage_path):
-                with open(self.file_storage_path, 'r', encoding='utf-8') as f:
-                    return json.loads(f.read())
-            return []
-        except Exception as e:
+            if not os.path.exists(self.file_storage_path):
+                return paths
+            with open(self.file_storage_path, 'rb') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    # A crash mid-append leaves a truncated line; skip it rather than lose every path
+                    try:
+                        paths.add(orjson.loads(line).get('profile_path'))
+                    except (orjson.JSONDecodeError, AttributeError) as e:
+                        logger.warning(f"Skipping unreadable line {line_number} in {self.file_storage_path}: {e}")
+        except OSError as e:
             logger.error(f"Error loading from file: {e}")
-            return []
+        return paths
     
     def save_to_file(self, profiles_data):
-        """Save profiles to JSON file"""
+        """Append profiles to NDJSON file"""
         try:
-            self.existing_profiles.extend(profiles_data)
-            with open(self.file_storage_path, 'w', encoding='utf-8') as f:
-                json.dump(self.existing_profiles, f, indent=2, ensure_ascii=False)
+            self.seen_paths.update(p['profile_path'] for p in profiles_data)
+            with open(self.file_storage_path, 'ab+') as f:
+                # Terminate a line truncated by an earlier crash so the next record isn't glued onto it
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                f.writelines(orjson.dumps(p) + b'\n' for p in profiles_data)
             logger.info(f"Saved {len(profiles_data)} profiles to {self.file_storage_path}")
         except Exception as e:
             logger.error(f"Error saving to file: {e}")
     
     def profile_exists(self, profile_path):
         """Check if profile already exists"""
-        if self.use_file_storage:
-            return any(p.get('profile_path') == profile_path for p in self.existing_profiles)
-        elif collection is not None:
-            return collection.find_one({"profile_path": profile_path}) is not None
-        return False
+        return profile_path in self.seen_paths
     
     def save_profiles(self, profiles_data):
         """Save profiles to database or file"""
@@ -137,70 +260,133 @@ class PaginatedScraper:
         if self.use_file_storage:
             self.save_to_file(profiles_data)
         elif collection is not None:
-            try:
-                collection.insert_many(profiles_data)
-                logger.info(f"Saved {len(profiles_data)} profiles to MongoDB")
-            except Exception as e:
-                logger.error(f"Error saving to MongoDB: {e}")
-                # Fallback to file storage
-                logger.info("Falling back to file storage...")
-                self.use_file_storage = True
-                self.save_to_file(profiles_data)
+            # Buffer across pages so MongoDB gets a few large batches
+            self.pending_profiles.extend(profiles_data)
+            self.seen_paths.update(p['profile_path'] for p in profiles_data)
+            if len(self.pending_profiles) >= self.batch_size:
+                self.flush()
         else:
             # No database connection, use file storage
             logger.info("No database connection, using file storage...")
             self.use_file_storage = True
             self.save_to_file(profiles_data)
     
-    def get_page(self, url):
-        """Fetch a single page with error handling"""
+    def flush(self):
+        """Write buffered profiles to MongoDB"""
+        if not self.pending_profiles or collection is None:
+            return
+        
+        batch, self.pending_profiles = self.pending_profiles, []
         try:
-            logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            time.sleep(self.delay)  # Be respectful to the server
-            return response.text
-        except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {e}")
+            # Upsert against the unique profile_path index so MongoDB drops duplicates,
+            # unordered so one bad document doesn't drop the rest of the batch.
+            # MongoDB refuses to bypass validation on unacknowledged (w=0) writes.
+            collection.bulk_write(
+                [profile_upsert(doc) for doc in batch],
+                ordered=False,
+                bypass_document_validation=collection.write_concern.acknowledged
+            )
+            logger.info(f"Saved {len(batch)} profiles to MongoDB")
+        except BulkWriteError as e:
+            logger.error(f"Saved {e.details.get('nUpserted', 0)} of {len(batch)} profiles to MongoDB: "
+                         f"{len(e.details.get('writeErrors', []))} write errors")
+        except Exception as e:
+            logger.error(f"Error saving to MongoDB: {e}")
+            # Fallback to file storage
+            logger.info("Falling back to file storage...")
+            self.use_file_storage = True
+            self.save_to_file(batch)
+    
+    def host_semaphore(self, url):
+        """Get the semaphore bounding concurrent requests to the url's host"""
+        host = urlparse(url).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.concurrency)
+        return self.host_semaphores[host]
+    
+    async def read_body(self, url, response):
+        """Read a response body as raw bytes, giving up past max_content_length"""
+        if response.content_length is not None and response.content_length > self.max_content_length:
+            logger.warning(f"Skipping {url}: Content-Length {response.content_length} exceeds limit")
             return None
+        
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body.extend(chunk)
+            if len(body) > self.max_content_length:
+                logger.warning(f"Skipping {url}: body exceeds {self.max_content_length} bytes")
+                return None
+        return bytes(body)
+    
+    def response_charset(self, url, response):
+        """Get the charset from the Content-Type header, or None if missing or unknown"""
+        charset = response.charset
+        if charset is None:
+            return None
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            logger.warning(f"Ignoring unknown charset {charset!r} from {url}")
+            return None
+        return charset
+    
+    async def get_page(self, url):
+        """Fetch a single page as (body bytes, header charset), or (None, None) on failure
+
+        The charset is None when the Content-Type header doesn't give one; the
+        parsers then fall back to the page's own <meta charset>.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.host_semaphore(url), self.rate_limiter:
+                    logger.info(f"Fetching: {url}")
+                    async with self.session.get(url) as response:
+                        response.raise_for_status()
+                        return await self.read_body(url, response), self.response_charset(url, response)
+            except aiohttp.ClientResponseError as e:
+                # Client errors (404 etc.) won't go away on retry
+                if e.status < 500 and e.status != 429:
+                    logger.error(f"Error fetching {url}: {e}")
+                    return None, None
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+        
+        logger.error(f"Error fetching {url}: {error}")
+        return None, None
     
-    def find_pagination_links(self, soup, current_url):
+    def find_pagination_links(self, tree, current_url, visited_urls=()):
         """Find pagination links - customize this based on the website's pagination structure"""
         pagination_links = []
+        seen = set()
         
-        # Common pagination patterns - adjust these selectors based on the target website
-        selectors = [
-            'a[rel="next"]',  # Next link with rel attribute
-            '.pagination a',  # Links in pagination class
-            '.pager a',       # Links in pager class
-            'a:contains("Next")',  # Links containing "Next" text
-            'a:contains(">")',     # Links containing ">" symbol
-            '.page-numbers a',     # WordPress style pagination
-            '.pagination-next a',  # Another common pattern
-        ]
+        def add_link(href):
+            # Convert relative URLs to absolute, keeping the first occurrence only
+            full_url = urljoin(current_url, href)
+            if full_url not in seen and full_url not in visited_urls:
+                seen.add(full_url)
+                pagination_links.append(full_url)
         
-        for selector in selectors:
+        for selector in PAGINATION_SELECTORS:
             try:
-                links = soup.select(selector)
+                links = tree.css(selector)
                 for link in links:
-                    href = link.get('href')
+                    href = link.attributes.get('href')
                     if href:
-                        # Convert relative URLs to absolute
-                        full_url = urljoin(current_url, href)
-                        pagination_links.append(full_url)
+                        add_link(href)
             except Exception as e:
                 logger.debug(f"Error with selector {selector}: {e}")
         
         # Also look for numbered pagination
-        page_links = soup.find_all('a', href=re.compile(r'page=\d+|p=\d+|/page/\d+'))
-        for link in page_links:
-            href = link.get('href')
-            if href:
-                full_url = urljoin(current_url, href)
-                pagination_links.append(full_url)
+        for link in tree.css('a[href]'):
+            href = link.attributes.get('href')
+            if href and PAGE_PATTERN.search(href):
+                add_link(href)
         
-        # Remove duplicates and return
-        return list(set(pagination_links))
+        return pagination_links
     
     def extract_name_from_article(self, article):
         """Extract name information from article element"""
@@ -275,90 +461,68 @@ class PaginatedScraper:
         
         return name_info
     
-    def detect_pagination_pattern(self, url):
-        """Detect pagination pattern and generate page URLs"""
-        page_urls = []
-        
-        # Pattern 1: Query parameter (page=1, p=1, etc.)
-        if '?' in url:
-            base_url, params = url.split('?', 1)
-            # Try incrementing page numbers
-            for page_num in range(1, 51):  # Limit to reasonable number
-                test_url = f"{base_url}?{params}&page={page_num}"
-                page_urls.append(test_url)
-                
-                # Also try 'p' parameter
-                test_url2 = f"{base_url}?{params}&p={page_num}"
-                page_urls.append(test_url2)
-        
-        # Pattern 2: Path-based pagination (/page/1, /p/1, etc.)
-        else:
-            for page_num in range(1, 51):
-                page_urls.extend([
-                    f"{url}/page/{page_num}",
-                    f"{url}/p/{page_num}",
-                    f"{url}?page={page_num}",
-                    f"{url}?p={page_num}"
-                ])
+    async def probe_page(self, url):
+        """Check with a HEAD request whether a page exists, returning its headers"""
+        try:
+            async with self.host_semaphore(url), self.rate_limiter:
+                async with self.session.head(url, allow_redirects=True) as response:
+                    if response.status >= 400:
+                        return None
+                    return response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Error probing {url}: {e}")
+            return None
+    
+    async def detect_pagination_pattern(self, url, max_pages=50):
+        """Yield ?page=N URLs for as long as the server has pages to serve"""
+        separator = '&' if '?' in url else '?'
+        previous_etag = None
         
-        return page_urls
+        for page_num in range(1, max_pages + 1):
+            page_url = f"{url}{separator}page={page_num}"
+            headers = await self.probe_page(page_url)
+            if headers is None:
+                break
+            
+            # Out-of-range pages often just repeat the last one
+            etag = headers.get('ETag')
+            if etag and etag == previous_etag:
+                break
+            previous_etag = etag
+            
+            yield page_url
     
-    def scrape_profile(self, profile_url):
+    async def scrape_profile(self, profile_url):
         """Scrape individual profile page"""
         try:
-            html = self.get_page(profile_url)
+            html, charset = await self.get_page(profile_url)
             if not html:
                 return None
             
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Your existing profile scraping logic
-            target_divs = soup.find_all('div', class_="col-xs-12 col-sm-9 bio-btm-left")
+            # The header charset wins; without one lxml reads <meta charset>
+            parser = lxml_html.HTMLParser(encoding=charset) if charset else None
+            doc = lxml_html.fromstring(html, parser=parser)
             
             combined_text = []  # List to store all text chunks
-            target_name = soup.find('div', class_="col-xs-12 col-sm-5 bio-top-left")
-
-            if target_name:
-                h1_element = target_name.find('h1')
-            
-            
-            name = h1_element.get_text(strip=True)
+            name = PROFILE_NAME_XPATH(doc).strip()
 
-            areasOfExpertise = soup.find("div", class_ = "col-xs-12 col-sm-6 bio-exp")
-            if areasOfExpertise:
-                ul_element = areasOfExpertise.find_all("ul")
-                for item in ul_element:
-                    text = item.get_text(strip = True)
-                    if text:
-                        combined_text.append("Areas of Expertise: ")
+            for item in PROFILE_EXPERTISE_XPATH(doc):
+                text = ' '.join(item.text_content().split())
+                if text:
+                    combined_text.append(f"Areas of Expertise: {text}")
 
-                        combined_text.append(text)
-                        combined_text.append("  ")
-
-            
-            for div in target_divs:
-                p_tags = div.find_all('p')  # find_all returns a list
-                if p_tags:
-                    for p in p_tags:
-                        text = p.get_text(strip=True)
-                        if text:  # Only add non-empty text
-                            combined_text.append(" ")
-
-                            combined_text.append(text)
-                            combined_text.append(" ")
-         
-            
-            
+            for p in PROFILE_ABOUT_XPATH(doc):
+                text = ' '.join(p.text_content().split())
+                if text:  # Only add non-empty text
+                    combined_text.append(text)
             
-            # Join all text with spaces or newlines
+            # Join all text with spaces
             if combined_text:
-                return {"about":  ''.join(combined_text),
-                        "name": name
-                                 
-                                 
-                                 
-                                 }
+                return {"about": ' '.join(combined_text), "name": name}
                 
+            # Rare pages without the standard layout fall back to BeautifulSoup
+            soup = make_soup(html, parse_only=PROFILE_FALLBACK_STRAINER, from_encoding=charset)
+            
             # Alternative selectors if the original doesn't work
             alternative_selectors = [
                 '.biography p',
@@ -383,13 +547,15 @@ class PaginatedScraper:
             logger.error(f"Error scraping profile {profile_url}: {e}")
             return None
     
-    def scrape_directory_page(self, url):
+    async def scrape_directory_page(self, url, visited_urls=()):
         """Scrape a single directory page for faculty profiles"""
-        html = self.get_page(url)
+        html, charset = await self.get_page(url)
         if not html:
             return [], []
         
-        soup = BeautifulSoup(html, "html.parser")
+        # Listing pages only need anchors, so use the much faster selectolax parser
+        # Lexbor reads bytes as UTF-8, so decode with the header charset when there is one
+        tree = LexborHTMLParser(html.decode(charset, errors='replace') if charset else html)
         profiles_data = []
         
         # # Your existing scraping logic for individual articles
@@ -427,40 +593,38 @@ class PaginatedScraper:
         #             logger.warning(f"No data found for profile: {profile_url}")
         
         # # Find pagination links for next pages
-        pagination_links = self.find_pagination_links(soup, url)
-     
-  
-
-        # Get all anchor tags
-        all_links = soup.find_all('a')
+        pagination_links = self.find_pagination_links(tree, url, visited_urls)
 
-        # Filter for people links
-        people_links = []
-        for link in all_links:
-            href = link.get('href')
-            if href and '/people/' in href:
-                people_links.append(href)
+        # Get people links straight from the anchor tags
+        people_links = [link.attributes.get('href') for link in tree.css('a[href*="/people/"]')]
 
         print(f"Found {len(people_links)} people links:")
-        for link in people_links:
-            person = urljoin(self.base_url, link)
-            name = ""
-            about = ""
+        people = []
+        for person in dict.fromkeys(urljoin(self.base_url, link) for link in people_links):
+            # Check if profile already exists
+            if self.profile_exists(person):
+                logger.info(f"Profile {person} already exists, skipping")
+                continue
+            people.append(person)
 
-            text = self.scrape_profile(person)
-            if text:
-                name = ""
-                about = ""
+        # Fetch all profiles on this page concurrently
+        texts = await asyncio.gather(*[self.scrape_profile(person) for person in people])
 
-            if text:
-                if isinstance(text, dict):
-                    # Main return path - dictionary with 'name' and 'about'
-                    name = text.get('name', '')
-                    about = text.get('about', '')
-                else:
-                    # Fallback return path - just a string (about text only)
-                    about = str(text)
-                    name = ""  # No name available from fallback
+        for person, text in zip(people, texts):
+            # A failed fetch (or a page with nothing to extract) isn't saved, so
+            # its path stays out of seen_paths and the next run retries it
+            if not text:
+                logger.warning(f"No data found for profile: {person}")
+                continue
+
+            if isinstance(text, dict):
+                # Main return path - dictionary with 'name' and 'about'
+                name = text.get('name', '')
+                about = text.get('about', '')
+            else:
+                # Fallback return path - just a string (about text only)
+                about = str(text)
+                name = ""  # No name available from fallback
 
             doc = {
                 "profile_path": person,
@@ -482,84 +646,86 @@ class PaginatedScraper:
             
         return profiles_data, pagination_links
     
-    def scrape_all_pages(self, start_url, max_pages=None):
+    async def scrape_all_pages(self, start_url, max_pages=None):
         """Scrape all pages starting from the given URL"""
         visited_urls = set()
-        urls_to_visit = [start_url]
+        urls_to_visit = deque([start_url])
+        queued_urls = {start_url}  # Mirrors urls_to_visit for O(1) membership checks
         all_profiles = []
         page_count = 0
         
-        while urls_to_visit and (max_pages is None or page_count < max_pages):
-            current_url = urls_to_visit.pop(0)
+        try:
+            while urls_to_visit and (max_pages is None or page_count < max_pages):
+                current_url = urls_to_visit.popleft()
+                queued_urls.discard(current_url)
             
-            if current_url in visited_urls:
-                continue
+                if current_url in visited_urls:
+                    continue
             
-            visited_urls.add(current_url)
-            page_count += 1
+                visited_urls.add(current_url)
+                page_count += 1
             
-            logger.info(f"Scraping page {page_count}: {current_url}")
+                logger.info(f"Scraping page {page_count}: {current_url}")
             
-            profiles_data, pagination_links = self.scrape_directory_page(current_url)
+                profiles_data, pagination_links = await self.scrape_directory_page(current_url, visited_urls)
             
-            if profiles_data:
-                # Save to database or file
-                self.save_profiles(profiles_data)
-                all_profiles.extend(profiles_data)
-            else:
-                logger.info(f"No new profiles found on page {page_count}")
+                if profiles_data:
+                    # Save to database or file
+                    self.save_profiles(profiles_data)
+                    all_profiles.extend(profiles_data)
+                else:
+                    logger.info(f"No new profiles found on page {page_count}")
             
-            # Add new pagination links to visit
-            for link in pagination_links:
-                if link not in visited_urls and link not in urls_to_visit:
-                    urls_to_visit.append(link)
+                # Add new pagination links to visit
+                for link in pagination_links:
+                    if link not in queued_urls:
+                        queued_urls.add(link)
+                        urls_to_visit.append(link)
             
-            # If no profiles found and no pagination links, we might be done
-            if not profiles_data and not pagination_links:
-                logger.info("No more profiles or pagination links found")
-                break
+                # If no profiles found and nothing left to visit, we're done
+                if not profiles_data and not urls_to_visit:
+                    logger.info("No more profiles or pagination links found")
+                    break
+        finally:
+            self.flush()
         
         return all_profiles
 
-def main():
+async def main():
     base_url = "https://linguistics.osu.edu/people"
 
     
     # Determine storage method based on database availability
     use_file_storage = collection is None
     if use_file_storage:
-        logger.info("Using file storage (faculty_profiles.json)")
+        logger.info("Using file storage (faculty_profiles.ndjson)")
     else:
         logger.info("Using MongoDB storage")
     
-    scraper = PaginatedScraper(base_url, delay=2, use_file_storage=use_file_storage)
-    
     try:
-        # Method 1: Start with known URL and follow pagination
-        logger.info("Starting pagination scrape...")
-        all_profiles = scraper.scrape_all_pages(base_url, max_pages=50)  # Limit to 50 pages
+        async with PaginatedScraper(base_url, delay=2, use_file_storage=use_file_storage) as scraper:
+            # Method 1: Start with known URL and follow pagination
+            logger.info("Starting pagination scrape...")
+            all_profiles = await scraper.scrape_all_pages(base_url, max_pages=50)  # Limit to 50 pages
         
-        # Method 2: If pagination isn't automatically detected, try common patterns
-        if not all_profiles:
-            logger.info("No profiles found with automatic pagination, trying manual patterns...")
-            test_urls = scraper.detect_pagination_pattern(base_url)
+            # Method 2: If pagination isn't automatically detected, try common patterns
+            if not all_profiles:
+                logger.info("No profiles found with automatic pagination, probing ?page=N...")
             
-            for url in test_urls[:10]:  # Test first 10 patterns
-                profiles_data, _ = scraper.scrape_directory_page(url)
-                if profiles_data:
-                    scraper.save_profiles(profiles_data)
-                    all_profiles.extend(profiles_data)
-                    logger.info(f"Found profiles on: {url}")
-                else:
-                    break  # Stop if no profiles found
+                async for url in scraper.detect_pagination_pattern(base_url):
+                    profiles_data, _ = await scraper.scrape_directory_page(url)
+                    if profiles_data:
+                        scraper.save_profiles(profiles_data)
+                        all_profiles.extend(profiles_data)
+                        logger.info(f"Found profiles on: {url}")
+                    else:
+                        break  # Stop if no profiles found
         
-        logger.info(f"Scraping complete! Total profiles scraped: {len(all_profiles)}")
+            logger.info(f"Scraping complete! Total profiles scraped: {len(all_profiles)}")
         
-        if use_file_storage:
-            logger.info(f"Data saved to: {scraper.file_storage_path}")
+            if use_file_storage:
+                logger.info(f"Data saved to: {scraper.file_storage_path}")
         
-    except KeyboardInterrupt:
-        logger.info("Scraping interrupted by user")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
@@ -567,4 +733,12 @@ def main():
             client.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Ctrl-C cancels main() (running its cleanup), then the runner raises KeyboardInterrupt here
+    try:
+        # uvloop.run only exists in uvloop >= 0.18; older versions use the default loop
+        if uvloop is not None and hasattr(uvloop, "run"):
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Scraping interrupted by user")
\ No newline at end of file
@@ -1,19 +1,42 @@
 import os
+import json
 from dotenv import load_dotenv
 from pymongo import MongoClient
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_huggingface import HuggingFacePipeline
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.llms import LlamaCpp
 from langchain.schema import Document
 from langchain.chains import RetrievalQA
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, pipeline
 import torch
+import faiss
 
 # In .env put
 # MONGODB_URI=mongodb+srv://XXXXXXXXX.XXXXXXXX.mongodb.net/
+# On CPU-only machines, optionally point at a Q4_K_M GGUF of the model:
+# QWEN_GGUF_PATH=models/qwen1_5-1_8b-chat-q4_k_m.gguf
 
 load_dotenv()
 MONGO_URI = os.getenv("MONGODB_URI")
+GGUF_MODEL_PATH = os.getenv("QWEN_GGUF_PATH")
+FAISS_INDEX_DIR = "faiss_index"
+INDEX_MANIFEST_PATH = os.path.join(FAISS_INDEX_DIR, "manifest.json")
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+NORMALIZE_EMBEDDINGS = True
+HNSW_NEIGHBORS = 32
+
+# How the saved index was built; if this changes, its vectors can't be mixed with new ones
+INDEX_MANIFEST = {
+    "model_name": EMBEDDING_MODEL_NAME,
+    "normalize_embeddings": NORMALIZE_EMBEDDINGS,
+    "index_type": f"IndexHNSWFlat(M={HNSW_NEIGHBORS})"
+}
+
+# Only the fields the chatbot reads are sent over the wire
+PROFILE_PROJECTION = {"full_name": 1, "about_me": 1, "profile_url": 1, "profile_path": 1, "_id": 0}
 
 try:
     client = MongoClient(MONGO_URI)
@@ -24,7 +47,10 @@ except Exception as e:
     exit()
 
 print("Loading embedding model...")
-embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+embedding_model = HuggingFaceEmbeddings(
+    model_name=EMBEDDING_MODEL_NAME,
+    encode_kwargs={"batch_size": 64, "normalize_embeddings": NORMALIZE_EMBEDDINGS}
+)
 
 # Use a more reliable model - Microsoft DialoGPT or a smaller model
 print("Loading language model...")
@@ -33,89 +59,208 @@ model_id = "Qwen/Qwen1.5-1.8B-Chat"
 # model_id = "distilgpt2"
 
 try:
-    tokenizer = AutoTokenizer.from_pretrained(model_id)
-    if tokenizer.pad_token is None:
-        tokenizer.pad_token = tokenizer.eos_token
-    
-    model = AutoModelForCausalLM.from_pretrained(
-        model_id,
-        torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-        device_map="auto" if torch.cuda.is_available() else None
-    )
-    
-    pipe = pipeline(
-        "text-generation", 
-        model=model, 
-        tokenizer=tokenizer, 
-        max_new_tokens=256,
-        do_sample=True,
-        temperature=0.7,
-        pad_token_id=tokenizer.eos_token_id
-    )
-    llm = HuggingFacePipeline(pipeline=pipe)
+    if not torch.cuda.is_available() and GGUF_MODEL_PATH:
+        # llama.cpp's int4 CPU kernels beat fp32 transformers on memory bandwidth
+        llm = LlamaCpp(
+            model_path=GGUF_MODEL_PATH,
+            n_ctx=4096,
+            max_tokens=256,
+            temperature=0.7
+        )
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        
+        if torch.cuda.is_available():
+            # 4-bit NF4 weights cut the memory read per generated token
+            model = AutoModelForCausalLM.from_pretrained(
+                model_id,
+                quantization_config=BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_compute_dtype=torch.float16
+                ),
+                device_map="auto"
+            )
+        else:
+            model = AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=torch.float32)
+        
+        pipe = pipeline(
+            "text-generation", 
+            model=model, 
+            tokenizer=tokenizer, 
+            max_new_tokens=256,
+            do_sample=True,
+            temperature=0.7,
+            pad_token_id=tokenizer.eos_token_id
+        )
+        llm = HuggingFacePipeline(pipeline=pipe)
     print("Language model loaded successfully.")
     
 except Exception as e:
     print(f"Error loading language model: {e}")
 
-# Load documents
-print("Loading professor profiles...")
-docs = []
-profiles_with_about_me = 0
-profiles_without_about_me = 0
-
-for prof in collection.find():
-    full_name = prof.get("full_name", "Unknown")
-    about_me_raw = prof.get("about_me", "")
-    profile_url = prof.get("profile_url", "")
-    profile_path = prof.get("profile_path", "")
-
-    about_me = ""
-    if isinstance(about_me_raw, str):
-        about_me = about_me_raw.strip()
-    elif isinstance(about_me_raw, dict):
-        about_me = about_me_raw.get("about", "")
+def load_documents(query):
+    """Build one Document per professor profile matching the query"""
+    docs = []
+    profiles_with_about_me = 0
+    profiles_without_about_me = 0
+
+    for prof in collection.find(query, PROFILE_PROJECTION).batch_size(500):
+        full_name = prof.get("full_name", "Unknown")
+        about_me_raw = prof.get("about_me", "")
+        profile_url = prof.get("profile_url", "")
+        profile_path = prof.get("profile_path", "")
+
+        about_me = ""
+        if isinstance(about_me_raw, str):
+            about_me = about_me_raw.strip()
+        elif isinstance(about_me_raw, dict):
+            about_me = about_me_raw.get("about", "")
+        
+        # Build content from available fields
+        content_parts = [f"Professor {full_name}"]
+        
+        if about_me and about_me.strip():
+            content_parts.append(f"About: {about_me}")
+            profiles_with_about_me += 1
+        else:
+            content_parts.append("No detailed about me information available")
+            profiles_without_about_me += 1
+        
+        # Join all available information
+        content = ". ".join(content_parts) + "."
+        
+        metadata = {
+            "name": full_name,
+            "url": profile_url,
+            "profile_path": profile_path,
+            "about_me": about_me,
+            "has_about_me": bool(about_me and about_me.strip())
+        }
+        
+        docs.append(Document(page_content=content, metadata=metadata))
+
+    print(f"Loaded {len(docs)} professor profiles.")
+    print(f"- {profiles_with_about_me} profiles have 'about_me' sections")
+    print(f"- {profiles_without_about_me} profiles don't have 'about_me' sections")
+    return docs
+
+def embed_documents(docs):
+    """Embed the documents' text in large batches, returning (text, embedding) pairs"""
+    texts = [doc.page_content for doc in docs]
+    return list(zip(texts, embedding_model.embed_documents(texts)))
+
+def create_vectorstore(text_embeddings, metadatas):
+    """Build a vector store over precomputed (text, embedding) pairs"""
+    # HNSW graph search stays sub-linear as the corpus grows, unlike the default flat index
+    index = faiss.IndexHNSWFlat(len(text_embeddings[0][1]), HNSW_NEIGHBORS)
+    vectorstore = FAISS(
+        embedding_function=embedding_model,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+    vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+    return vectorstore
+
+def save_vectorstore(vectorstore):
+    """Save the vector store along with the manifest describing how it was built"""
+    # Write the manifest last so a half-written save is never loaded as valid
+    if os.path.exists(INDEX_MANIFEST_PATH):
+        os.remove(INDEX_MANIFEST_PATH)
+    vectorstore.save_local(FAISS_INDEX_DIR)
+    with open(INDEX_MANIFEST_PATH, "w") as f:
+        json.dump(INDEX_MANIFEST, f)
+
+def load_vectorstore():
+    """Load the saved vector store, or None if it is missing or was built differently"""
+    if not os.path.isdir(FAISS_INDEX_DIR):
+        return None
     
-    # Build content from available fields
-    content_parts = [f"Professor {full_name}"]
+    try:
+        with open(INDEX_MANIFEST_PATH) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if manifest != INDEX_MANIFEST:
+        print("Saved vector store was built with different settings, rebuilding.")
+        return None
     
-    if about_me and about_me.strip():
-        content_parts.append(f"About: {about_me}")
-        profiles_with_about_me += 1
-    else:
-        content_parts.append("No detailed about me information available")
-        profiles_without_about_me += 1
+    try:
+        vectorstore = FAISS.load_local(FAISS_INDEX_DIR, embedding_model, allow_dangerous_deserialization=True)
+        print(f"Loaded saved vector store from {FAISS_INDEX_DIR}/.")
+        return vectorstore
+    except Exception as e:
+        print(f"Error loading saved vector store, rebuilding: {e}")
+        return None
+
+def indexed_documents(vectorstore):
+    """Yield (index position, Document) for every vector in the store"""
+    for position, doc_id in vectorstore.index_to_docstore_id.items():
+        yield position, vectorstore.docstore.search(doc_id)
+
+def drop_profiles(vectorstore, profile_paths):
+    """Rebuild the store without the given profiles, reusing the stored vectors"""
+    # HNSW indexes don't support removing vectors, so copy the survivors into a new one
+    text_embeddings = []
+    metadatas = []
+    for position, doc in indexed_documents(vectorstore):
+        if doc.metadata.get("profile_path") in profile_paths:
+            continue
+        text_embeddings.append((doc.page_content, vectorstore.index.reconstruct(position)))
+        metadatas.append(doc.metadata)
     
-    # Join all available information
-    content = ". ".join(content_parts) + "."
+    return create_vectorstore(text_embeddings, metadatas) if text_embeddings else None
+
+# Reuse the saved vector store so only new profiles need embedding
+vectorstore = load_vectorstore()
+vectorstore_changed = False
+
+print("Loading professor profiles...")
+if vectorstore is None:
+    docs = load_documents({})
+else:
+    stored_paths = set(collection.distinct("profile_path"))
+    indexed_paths = {doc.metadata.get("profile_path") for _, doc in indexed_documents(vectorstore)}
     
-    metadata = {
-        "name": full_name,
-        "url": profile_url,
-        "profile_path": profile_path,
-        "about_me": about_me,
-        "has_about_me": bool(about_me and about_me.strip())
-    }
+    # Profiles deleted from MongoDB shouldn't stay searchable
+    stale_paths = indexed_paths - stored_paths
+    if stale_paths:
+        print(f"Removing {len(stale_paths)} profiles no longer in MongoDB...")
+        vectorstore = drop_profiles(vectorstore, stale_paths)
+        vectorstore_changed = True
     
-    docs.append(Document(page_content=content, metadata=metadata))
+    new_paths = stored_paths - indexed_paths
+    docs = load_documents({"profile_path": {"$in": list(new_paths)}}) if new_paths else []
 
-print(f"Loaded {len(docs)} professor profiles.")
-print(f"- {profiles_with_about_me} profiles have 'about_me' sections")
-print(f"- {profiles_without_about_me} profiles don't have 'about_me' sections")
-
-if not docs:
+if vectorstore is None and not docs:
     print("no profiles found")
     exit()
 
 print("Creating vector store...")
 try:
-    vectorstore = FAISS.from_documents(docs, embedding_model)
+    if vectorstore is None:
+        vectorstore = create_vectorstore(embed_documents(docs), [doc.metadata for doc in docs])
+        vectorstore_changed = True
+    elif docs:
+        vectorstore.add_embeddings(embed_documents(docs), metadatas=[doc.metadata for doc in docs])
+        vectorstore_changed = True
+    
     retriever = vectorstore.as_retriever(search_kwargs={"k": 3})  # K is the number of content docs loaded in context
     print("Vector store created successfully.")
 except Exception as e:
     print(f"Error creating vector store: {e}")
     exit()
 
+# The saved copy is only a cache; the in-memory store works without it
+if vectorstore_changed:
+    try:
+        save_vectorstore(vectorstore)
+    except Exception as e:
+        print(f"Error saving vector store to {FAISS_INDEX_DIR}/, continuing without cache: {e}")
+
 try:
     qa_chain = RetrievalQA.from_chain_type(
         llm=llm,